@@ -1,8 +1,197 @@
+import functools
 import os
 import re
-from pathlib import Path
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import unquote, quote
 
+try:
+    # Ahead-of-time build of _strip_guid_scanner, see compile_accelerator()
+    from rename_accel import strip_guid as _accel_strip_guid
+except ImportError:
+    _accel_strip_guid = None
+
+# Numba is slow to import, so only load it when there is no prebuilt scanner
+numba = None
+if _accel_strip_guid is None:
+    try:
+        import numba
+    except ImportError:
+        pass
+
+# Pattern for hex strings (32 or more hex characters, with or without dashes)
+_GUID_RE = re.compile(r'[-_\s][0-9a-fA-F\-]{32,}')
+
+# Shortest possible match: one delimiter plus 32 hex characters
+_MIN_HEX_RUN = 32
+_MIN_GUID_LEN = _MIN_HEX_RUN + 1
+
+# Every ASCII character _GUID_RE accepts as a delimiter, including the
+# control characters that count as whitespace
+_ASCII_DELIMS = frozenset('-_' + ''.join(c for c in map(chr, range(128)) if c.isspace()))
+
+# Characters that can make up the hex string after the delimiter
+_HEX_CHARS = '0123456789abcdefABCDEF-'
+
+# Every byte that is not in _HEX_CHARS, for counting hex characters with
+# bytes.translate in one C-level call
+_NON_HEX_BYTES = bytes(b for b in range(256) if chr(b) not in _HEX_CHARS)
+
+# Anything quote(link, safe='/.#?=&') would percent-encode, apart from spaces
+_NEEDS_QUOTE_RE = re.compile(r'[^A-Za-z0-9_.\-~/#?=& ]')
+
+# Spaces are by far the most common character Notion encodes in links
+_SPACE_TO_PERCENT = str.maketrans({' ': '%20'})
+
+# Byte-level check for files that might contain a GUID. The delimiter class
+# also accepts any non-ASCII byte, so multi-byte whitespace is never missed
+_GUID_BYTES_RE = re.compile(rb'[-_\s\x1c-\x1f\x80-\xff][0-9a-fA-F\-]{32,}')
+
+# Pattern for inline markdown links: [text](filename)
+_INLINE_LINK_RE = re.compile(r'(?P<inline>\[(?P<text>[^\]]+)\]\((?P<inline_link>[^)]+)\))')
+
+# Reference-style and wiki-style links in one pattern, so they share a scan:
+# - reference-style links: [ref]: url
+# - wiki-style links: [[filename]]
+# Inline links keep a pass of their own that runs first. A reference link
+# swallows the rest of its line, so fusing inline links in here as well
+# would leave inline links later on that line uncleaned.
+_REF_WIKI_LINK_RE = re.compile(
+    r'(?P<ref>\[(?P<ref_name>[^\]]+)\]:\s*(?P<ref_link>.+)$)'
+    r'|(?P<wiki>\[\[(?P<wiki_link>[^\]]+)\]\])',
+    re.MULTILINE)
+
+# Below this many markdown files, starting worker processes costs more
+# than it saves
+_MIN_FILES_FOR_POOL = 64
+
+# ProcessPoolExecutor refuses more workers than this on Windows
+_WINDOWS_MAX_JOBS = 61
+
+# Number of markdown files handed to a worker process at a time
+_POOL_CHUNKSIZE = 16
+
+# Compiled --pattern regex replacing _GUID_RE, or None for the default
+_custom_guid_re = None
+
+# Original name -> cleaned name, shared by link cleaning and renaming
+_STRIP_CACHE = {}
+
+# Entries kept in _STRIP_CACHE before it is emptied and refilled
+_STRIP_CACHE_MAX = 16384
+
+# Number of buffered output lines written to stdout at a time
+_OUTPUT_BATCH = 500
+
+def _strip_guid_scanner(name):
+    """
+    Hand-written single pass equivalent of _GUID_RE.sub('', name).
+    
+    Finds each delimiter (hyphen, underscore or whitespace) followed by 32 or
+    more hex characters and drops it. Kept free of regex and other Python
+    objects so Numba can compile it.
+    """
+    result = ''
+    keep = 0
+    i = 0
+    n = len(name)
+    
+    while i < n:
+        c = name[i]
+        if c == '-' or c == '_' or c.isspace():
+            j = i + 1
+            while j < n and name[j] in _HEX_CHARS:
+                j += 1
+            if j - i - 1 >= 32:
+                result += name[keep:i]
+                keep = j
+            # No shorter match can start inside this run, so jump past it
+            i = j
+        else:
+            i += 1
+    
+    return result + name[keep:]
+
+# Prefer the ahead-of-time build, which needs no compiling at start-up.
+# Otherwise JIT-compile when Numba is installed (cached on disk after the
+# first run), and fall back to the regex.
+if _accel_strip_guid is not None:
+    _strip_guid = _accel_strip_guid
+elif numba is not None:
+    _strip_guid = numba.njit(cache=True)(_strip_guid_scanner)
+else:
+    _strip_guid = functools.partial(_GUID_RE.sub, '')
+
+def compile_accelerator(output_dir=None):
+    """
+    Build _strip_guid_scanner ahead of time into a rename_accel extension
+    module, so later runs skip importing Numba and JIT compilation entirely.
+    
+    Requires Numba. The module is written next to this script by default,
+    where the import at the top of this file picks it up.
+    """
+    try:
+        from numba.pycc import CC
+    except ImportError:
+        raise RuntimeError("Numba is required to build the accelerator") from None
+    
+    cc = CC('rename_accel')
+    cc.output_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
+    cc.export('strip_guid', 'unicode_type(unicode_type)')(_strip_guid_scanner)
+    cc.compile()
+
+def _fast_strip(name):
+    """
+    Equivalent of _strip_guid(name), specialised for the usual Notion shape
+    of a short title followed by one trailing hex string.
+    
+    The trailing hex run is found with rstrip and sliced off directly. Only
+    when the text before it is long enough to hide another match do we fall
+    back to the general scanner.
+    """
+    # rstrip both finds and validates the trailing hex run in one C call,
+    # without building a translated copy of the name
+    head = name.rstrip(_HEX_CHARS)
+    start = len(head)
+    
+    # Any other match would have to fit before the trailing hex run
+    if start - 1 >= _MIN_GUID_LEN:
+        return _strip_guid(name)
+    
+    # Underscore or whitespace right before the run: "Title abc123..."
+    if head and (head[-1] == '_' or head[-1].isspace()) and len(name) - start >= _MIN_HEX_RUN:
+        return head[:-1]
+    
+    # Otherwise the first hyphen inside the run is the only possible
+    # delimiter, e.g. "Recipe-abc123..." where the title ends in hex letters
+    hyphen = name.find('-', start)
+    if hyphen != -1 and len(name) - hyphen - 1 >= _MIN_HEX_RUN:
+        return name[:hyphen]
+    
+    return name
+
+def set_guid_pattern(pattern):
+    """
+    Strip names with a custom regex instead of the built-in Notion pattern.
+    
+    The fast paths only understand the built-in pattern, so a custom one is
+    applied as a plain regex substitution. Pass None to go back to the
+    default. Clears the name cache, since earlier results no longer apply.
+    """
+    global _custom_guid_re
+    
+    if pattern is None or pattern == _GUID_RE.pattern:
+        _custom_guid_re = None
+    else:
+        _custom_guid_re = re.compile(pattern)
+    _STRIP_CACHE.clear()
+
+def _strip_custom(name):
+    """
+    Remove every match of the custom --pattern regex.
+    """
+    return _custom_guid_re.sub('', name)
+
 def strip_guid_from_name(name):
     """
     Remove hex string patterns from a filename or folder name.
@@ -11,18 +200,63 @@ def strip_guid_from_name(name):
     - name_xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx (underscore + 32+ hex chars)
     - name-xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx (hyphen + 32+ hex chars)
     - name xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx (standard GUID format)
+
+    Results are kept in _STRIP_CACHE, since the same link targets repeat
+    across markdown files. The rename pass only reuses link-cleaning results
+    when links are cleaned in this process (small exports or jobs=1) and a
+    link target is a bare file name; pool workers keep their own caches.
+    The cache is emptied once it holds _STRIP_CACHE_MAX names.
     """
-    # Pattern for hex strings (32 or more hex characters, with or without dashes)
-    guid_pattern = r'[-_\s][0-9a-fA-F\-]{32,}'
+    cleaned_name = _STRIP_CACHE.get(name)
+    if cleaned_name is None:
+        if len(_STRIP_CACHE) >= _STRIP_CACHE_MAX:
+            _STRIP_CACHE.clear()
+        cleaned_name = _STRIP_CACHE[name] = _strip_guid_uncached(name)
+    return cleaned_name
+
+def _strip_guid_uncached(name):
+    """
+    Do the work for strip_guid_from_name, without consulting the cache.
+    """
+    if _custom_guid_re is not None:
+        strip = _strip_custom
+    else:
+        # Most names are too short or have no delimiter at all
+        if len(name) < _MIN_GUID_LEN or (name.isascii() and _ASCII_DELIMS.isdisjoint(name)):
+            return name
+        
+        # Long titles without a GUID have too few hex characters in total
+        hex_bytes = name.encode('utf-8', 'surrogatepass').translate(None, _NON_HEX_BYTES)
+        if len(hex_bytes) < _MIN_HEX_RUN:
+            return name
+        
+        strip = _fast_strip
     
     # For files, preserve the extension
     if '.' in name:
         name_part, ext = os.path.splitext(name)
-        cleaned_name = re.sub(guid_pattern, '', name_part)
+        cleaned_name = strip(name_part)
         return cleaned_name + ext
     else:
         # For folders or files without extensions
-        return re.sub(guid_pattern, '', name)
+        return strip(name)
+
+def clean_link_target(link):
+    """
+    Clean hex strings from a URL-encoded markdown link target.
+    
+    Only decodes when the link contains percent-encoding, and only falls
+    back to a full quote() when the cleaned link has characters other than
+    spaces that need encoding.
+    """
+    # Decode URL encoding to get actual filename
+    decoded_link = unquote(link) if '%' in link else link
+    # Clean the hex strings
+    cleaned_link = strip_guid_from_name(decoded_link)
+    # Re-encode for use in markdown link
+    if _NEEDS_QUOTE_RE.search(cleaned_link):
+        return quote(cleaned_link, safe='/.#?=&')
+    return cleaned_link.translate(_SPACE_TO_PERCENT)
 
 def clean_markdown_links(content):
     """
@@ -30,131 +264,275 @@ def clean_markdown_links(content):
     Handles both inline links [text](file.md) and reference-style links.
     Also handles URL-encoded links with %20 for spaces.
     """
-    # Pattern for inline markdown links: [text](filename)
     def replace_inline_link(match):
-        text = match.group(1)
-        link = match.group(2)
+        text = match.group('text')
+        link = match.group('inline_link')
+        
+        encoded_link = clean_link_target(link)
         
-        # Decode URL encoding to get actual filename
-        decoded_link = unquote(link)
-        # Clean the hex strings
-        cleaned_link = strip_guid_from_name(decoded_link)
-        # Re-encode for use in markdown link
-        encoded_link = quote(cleaned_link, safe='/.#?=&')
+        # Leave the link untouched if cleaning did not change it
+        if encoded_link == link:
+            return match.group(0)
         
         return f"[{text}]({encoded_link})"
     
-    # Pattern for reference-style links: [text][ref] or [ref]: url
     def replace_reference_link(match):
-        ref = match.group(1)
-        link = match.group(2)
+        ref = match.group('ref_name')
+        link = match.group('ref_link')
         
-        # Decode URL encoding to get actual filename
-        decoded_link = unquote(link)
-        # Clean the hex strings
-        cleaned_link = strip_guid_from_name(decoded_link)
-        # Re-encode for use in markdown link
-        encoded_link = quote(cleaned_link, safe='/.#?=&')
+        encoded_link = clean_link_target(link)
         
         return f"[{ref}]: {encoded_link}"
     
-    # Clean inline links: [text](link)
-    content = re.sub(r'\[([^\]]+)\]\(([^\)]+)\)', replace_inline_link, content)
-    
-    # Clean reference-style links: [ref]: link
-    content = re.sub(r'\[([^\]]+)\]:\s*(.+)$', replace_reference_link, content, flags=re.MULTILINE)
-    
-    # Clean wiki-style links: [[filename]]
     def replace_wiki_link(match):
-        link = match.group(1)
+        link = match.group('wiki_link')
         cleaned_link = strip_guid_from_name(link)
         return f"[[{cleaned_link}]]"
     
-    content = re.sub(r'\[\[([^\]]+)\]\]', replace_wiki_link, content)
+    replacers = {
+        'inline': replace_inline_link,
+        'ref': replace_reference_link,
+        'wiki': replace_wiki_link,
+    }
+    
+    changed = False
+    
+    # Dispatch on whichever link style matched
+    def replace_link(match):
+        nonlocal changed
+        replacement = replacers[match.lastgroup](match)
+        if replacement != match.group(0):
+            changed = True
+        return replacement
+    
+    cleaned_content = _INLINE_LINK_RE.sub(replace_link, content)
+    cleaned_content = _REF_WIKI_LINK_RE.sub(replace_link, cleaned_content)
+    
+    # Hand back the original string when no link changed, so the caller's
+    # comparison is an identity check instead of a full scan
+    if not changed:
+        return content
+    return cleaned_content
+
+def walk_post_order(directory_path):
+    """
+    Walk a directory tree bottom-up, yielding (path, name, is_dir) tuples for
+    every file and folder with children always before their parent folder.
+    
+    os.walk(topdown=False) gives this order natively, so there is nothing to
+    sort, and it works with plain strings rather than Path objects.
+    Unreadable folders are skipped.
+    """
+    for root, dirs, files in os.walk(directory_path, topdown=False):
+        for name in files:
+            yield os.path.join(root, name), name, False
+        for name in dirs:
+            yield os.path.join(root, name), name, True
+
+def write_lines(lines):
+    """
+    Write buffered output lines to stdout in one call and empty the buffer.
+    """
+    sys.stdout.write(''.join(lines))
+    lines.clear()
+
+def is_markdown_file(name, is_dir):
+    """
+    Check whether a walked directory entry is a markdown file.
+    """
+    return not is_dir and name.endswith('.md')
+
+def process_markdown_file(md_file, dry_run=True):
+    """
+    Clean links in a single markdown file.
+    
+    Returns a (updated, message) tuple. Messages are handed back rather than
+    printed so output stays in order when files are processed concurrently.
+    """
+    try:
+        with open(md_file, 'rb') as f:
+            data = f.read()
+        
+        # Without a possible GUID, only inline and reference links can be
+        # rewritten (by re-encoding), so skip decoding files that have neither.
+        # A custom --pattern could match anything, so it always decodes.
+        # The cheap substring tests go first so the regex scan only runs on
+        # files with no link syntax at all.
+        might_change = (_custom_guid_re is not None or b'](' in data or b']:' in data
+                        or _GUID_BYTES_RE.search(data))
+        if not might_change:
+            return False, None
+        
+        # Decode with the same newline handling as text mode
+        original_content = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        cleaned_content = clean_markdown_links(original_content)
+        
+        if cleaned_content != original_content:
+            if dry_run:
+                return False, f"Would update links in: {md_file}"
+            with open(md_file, 'wb') as f:
+                f.write(cleaned_content.replace('\n', os.linesep).encode('utf-8'))
+            return True, f"✓ Updated links in: {os.path.basename(md_file)}"
+    except Exception as e:
+        return False, f"✗ Error processing {md_file}: {e}"
     
-    return content
+    return False, None
 
-def update_markdown_files(directory_path, dry_run=True):
+def map_markdown_files(process, md_files, jobs=None):
+    """
+    Apply process to each markdown file, yielding results in input order.
+    
+    Cleaning links is regex work that holds the GIL, so large batches are
+    spread over a process pool of up to jobs workers (default: one per CPU).
+    Small batches, or jobs=1, run in this process.
+    """
+    if jobs == 1 or len(md_files) < _MIN_FILES_FOR_POOL:
+        yield from map(process, md_files)
+        return
+    
+    # Workers may be fresh interpreters, so hand them any custom pattern
+    pattern = _custom_guid_re.pattern if _custom_guid_re is not None else None
+    
+    with ProcessPoolExecutor(max_workers=jobs, initializer=set_guid_pattern,
+                             initargs=(pattern,)) as executor:
+        yield from executor.map(process, md_files, chunksize=_POOL_CHUNKSIZE)
+
+def update_markdown_files(directory_path, dry_run=True, md_files=None, jobs=None):
     """
     Update markdown file contents to clean links.
+    
+    Large exports are processed across several worker processes.
+    
+    Args:
+        directory_path: Root directory to process
+        dry_run: If True, only print what would be updated without writing
+        md_files: Optional list of markdown file paths already collected by
+            the caller, so the tree does not have to be walked again
+        jobs: Maximum number of worker processes (default: one per CPU)
     """
-    directory = Path(directory_path)
+    if md_files is None:
+        md_files = [path for path, name, is_dir in walk_post_order(os.fspath(directory_path))
+                    if is_markdown_file(name, is_dir)]
+    
     updated_count = 0
+    process = functools.partial(process_markdown_file, dry_run=dry_run)
     
-    for md_file in directory.rglob('*.md'):
-        try:
-            with open(md_file, 'r', encoding='utf-8') as f:
-                original_content = f.read()
-            
-            cleaned_content = clean_markdown_links(original_content)
-            
-            if cleaned_content != original_content:
-                if dry_run:
-                    print(f"Would update links in: {md_file}")
-                else:
-                    with open(md_file, 'w', encoding='utf-8') as f:
-                        f.write(cleaned_content)
-                    print(f"✓ Updated links in: {md_file.name}")
-                    updated_count += 1
-        except Exception as e:
-            print(f"✗ Error processing {md_file}: {e}")
+    lines = []
+    
+    try:
+        for updated, message in map_markdown_files(process, md_files, jobs):
+            if message:
+                lines.append(f"{message}\n")
+                if len(lines) >= _OUTPUT_BATCH:
+                    write_lines(lines)
+            if updated:
+                updated_count += 1
+    finally:
+        write_lines(lines)
     
     return updated_count
 
-def rename_recursively(directory_path, dry_run=True):
+def target_exists(parent, name, listings):
+    """
+    Check whether a name already exists in a folder.
+    
+    Each folder is listed once and cached in listings as a pair of sets:
+    exact names and casefolded names. A casefolded-only hit could be a
+    case-insensitive filesystem, so that case is confirmed with a real
+    stat instead of guessing.
+    """
+    if parent not in listings:
+        try:
+            names = set(os.listdir(parent))
+        except OSError:
+            names = set()
+        listings[parent] = (names, {n.casefold() for n in names})
+    
+    names, folded = listings[parent]
+    if name in names:
+        return True
+    if name.casefold() in folded:
+        return os.path.exists(os.path.join(parent, name))
+    return False
+
+def rename_recursively(directory_path, dry_run=True, jobs=None, update_links=True):
     """
     Recursively rename files and folders to remove GUIDs, and update markdown links.
     
     Args:
         directory_path: Root directory to process
         dry_run: If True, only print what would be renamed without actually renaming
+        jobs: Maximum number of worker processes for updating markdown links
+        update_links: If False, skip updating markdown links and only rename
     """
-    directory = Path(directory_path)
+    # Plain string paths are used throughout; pathlib adds per-entry
+    # overhead and every rename ends up in os.rename anyway. The path is not
+    # normalised: collapsing '..' textually can point at another directory.
+    directory = os.fspath(directory_path)
     
-    if not directory.exists():
+    if not os.path.exists(directory):
         print(f"Error: Directory '{directory_path}' does not exist")
         return
     
-    # First, update markdown file contents
-    print("=== Updating Markdown Links ===\n")
-    updated_count = update_markdown_files(directory_path, dry_run)
+    # Walk the tree once and share the listing between both passes.
+    # Post-order means children come before parents, so paths stay valid
+    # while we rename from the deepest level up.
+    entries = list(walk_post_order(directory))
     
-    if not dry_run:
-        print(f"\n✓ Updated {updated_count} markdown files\n")
+    # First, update markdown file contents
+    if update_links:
+        print("=== Updating Markdown Links ===\n")
+        md_files = [path for path, name, is_dir in entries if is_markdown_file(name, is_dir)]
+        updated_count = update_markdown_files(directory_path, dry_run, md_files, jobs)
+        
+        if not dry_run:
+            print(f"\n✓ Updated {updated_count} markdown files\n")
     
     print("\n=== Renaming Files and Folders ===\n")
     
     # Process from deepest level first to avoid issues with renaming parent folders
-    all_paths = sorted(directory.rglob('*'), key=lambda p: len(p.parts), reverse=True)
-    
     renamed_count = 0
+    listings = {}
+    lines = []
     
-    for path in all_paths:
-        if not path.is_file() and not path.is_dir():
-            continue
+    try:
+        for path, old_name, is_dir in entries:
+            if len(lines) >= _OUTPUT_BATCH:
+                write_lines(lines)
             
-        old_name = path.name
-        new_name = strip_guid_from_name(old_name)
-        
-        # Only rename if the name changed
-        if new_name != old_name and new_name.strip():
-            new_path = path.parent / new_name
-            
-            # Check if target already exists
-            if new_path.exists():
-                print(f"⚠️  Skipping (target exists): {path}")
-                continue
+            new_name = strip_guid_from_name(old_name)
             
-            if dry_run:
-                print(f"Would rename: {path}")
-                print(f"         to: {new_path}\n")
-            else:
-                try:
-                    path.rename(new_path)
-                    print(f"✓ Renamed: {old_name} → {new_name}")
-                    renamed_count += 1
-                except Exception as e:
-                    print(f"✗ Error renaming {path}: {e}")
+            # Only rename if the name changed
+            if new_name != old_name and new_name.strip():
+                # Skip anything that is neither a file nor a folder, such as
+                # broken symlinks. Only rename candidates pay for the stat.
+                if not is_dir and not os.path.isfile(path):
+                    continue
+                
+                parent = os.path.dirname(path)
+                new_path = os.path.join(parent, new_name)
+                
+                # Check if target already exists
+                if target_exists(parent, new_name, listings):
+                    lines.append(f"⚠️  Skipping (target exists): {path}\n")
+                    continue
+                
+                if dry_run:
+                    lines.append(f"Would rename: {path}\n")
+                    lines.append(f"         to: {new_path}\n\n")
+                else:
+                    try:
+                        os.rename(path, new_path)
+                        names, folded = listings[parent]
+                        names.discard(old_name)
+                        names.add(new_name)
+                        folded.add(new_name.casefold())
+                        lines.append(f"✓ Renamed: {old_name} → {new_name}\n")
+                        renamed_count += 1
+                    except Exception as e:
+                        lines.append(f"✗ Error renaming {path}: {e}\n")
+    finally:
+        write_lines(lines)
     
     if dry_run:
         print("\n*** DRY RUN MODE - No files were actually renamed ***")
@@ -169,9 +547,25 @@ if __name__ == "__main__":
     parser.add_argument('path', help='Directory path to process')
     parser.add_argument('--no-dry-run', action='store_true', 
                         help='Actually perform the renaming (default is dry-run mode)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Number of worker processes for updating markdown links (default: one per CPU)')
+    parser.add_argument('--no-markdown', action='store_true',
+                        help='Only rename files and folders, without updating links inside markdown files')
+    parser.add_argument('--pattern', default=_GUID_RE.pattern,
+                        help='Regex for the identifier to remove (default matches Notion hex strings)')
     
     args = parser.parse_args()
     
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if args.jobs is not None and sys.platform == 'win32' and args.jobs > _WINDOWS_MAX_JOBS:
+        parser.error(f'--jobs can be at most {_WINDOWS_MAX_JOBS} on Windows')
+    
+    try:
+        set_guid_pattern(args.pattern)
+    except re.error as e:
+        parser.error(f"invalid --pattern: {e}")
+    
     dry_run = not args.no_dry_run
     
     if dry_run:
@@ -180,4 +574,5 @@ if __name__ == "__main__":
     else:
         print("=== RENAMING FILES ===\n")
     
-    rename_recursively(args.path, dry_run=dry_run)
+    rename_recursively(args.path, dry_run=dry_run, jobs=args.jobs,
+                       update_links=not args.no_markdown)